@@ -418,7 +418,9 @@ class AnalysisAgent(BaseAgent):
         if raw_data[0]["screenshot"]:
             try:
                 screenshot_bytes = base64.b64decode(raw_data[0]["screenshot"])
-                images.append((screenshot_bytes, 'image/png'))
+                # Older records hold PNG screenshots, newer ones JPEG
+                mime_type = 'image/jpeg' if screenshot_bytes.startswith(b'\xff\xd8') else 'image/png'
+                images.append((screenshot_bytes, mime_type))
                 screenshot_available = True
             except Exception as e:
                 self.logger.error(f"Failed to decode screenshot: {e}")
@@ -2,6 +2,7 @@
 
 import asyncio
 from collections.abc import AsyncIterable
+import functools
 import os
 import json
 import time
@@ -28,6 +29,15 @@ from src.utils.logging import get_logger
 from src.schemas.tools_definitions import get_tool_implementations
 from src.utils.tts import TTSEngine, tee_stream
 
+@functools.lru_cache(maxsize=None)
+def _get_prompt_environment(prompt_folder: str) -> Environment:
+    """Get the shared Jinja environment for a prompt folder.
+
+    Agents pointed at the same folder reuse one environment, so templates
+    are loaded and compiled once per process instead of once per agent.
+    """
+    return Environment(loader=FileSystemLoader(prompt_folder))
+
 class ToolBehavior(Enum):
     """Controls how tools are used and their outputs handled."""
     USE_AND_DONE = "use_and_done"  # Use tool and return its output
@@ -69,7 +79,7 @@ class BaseAgent(AgentInterface):
         self.client = genai.Client(api_key=os.getenv("GEMINI_API_KEY")).aio
         self.model = self.config["llm"].get("model", "gemini-2.0-flash-exp")
         
-        self.env = Environment(loader=FileSystemLoader(prompt_folder))
+        self.env = _get_prompt_environment(prompt_folder)
         
         self.db = db
         self.ontology_manager = ontology_manager
@@ -1,6 +1,7 @@
+import functools
 import logging
 import os
-from typing import Dict, List, Optional, Callable, Any
+from typing import Dict, List, Optional, Callable, Any, Tuple, Type
 from pathlib import Path
 import asyncio
 import platform
@@ -18,6 +19,43 @@ from .macos_coordinator import MacOSCoordinator
 
 logger = logging.getLogger(__name__)
 
+@functools.cache
+def _system() -> str:
+    """Get the platform name, resolved once per process."""
+    return platform.system()
+
+@functools.cache
+def _is_wayland() -> bool:
+    """Check whether we are running under a Wayland session."""
+    return "WAYLAND_DISPLAY" in os.environ
+
+def _resolve_input_tracker_class() -> Optional[Type[BaseInputTracker]]:
+    """Pick the input tracker implementation for this platform.
+
+    Returns None on macOS (the coordinator owns the tracker there) and on
+    unsupported platforms.
+    """
+    system = _system()
+    if system == "Linux":
+        # Check if it's Wayland or X11, you might need a better detection method
+        return EvdevInputTracker if _is_wayland() else PynputInputTracker
+    elif system == "Windows":
+        return PynputInputTracker
+    return None
+
+def _resolve_screen_capture_backend() -> Optional[str]:
+    """Pick the default screen capture backend for this platform."""
+    system = _system()
+    if system == "Linux":
+        # grim on Wayland, mss for X11 or if detection fails
+        return "grim" if _is_wayland() else "mss"
+    elif system in ("Windows", "Darwin"):
+        return "mss"
+    return None
+
+_INPUT_TRACKER_CLS = _resolve_input_tracker_class()
+_DEFAULT_SCREEN_BACKEND = _resolve_screen_capture_backend()
+
 class ActivityManager:
     """Manages screen capture, audio recording, and input tracking."""
 
@@ -29,7 +67,7 @@ class ActivityManager:
         self.privacy_config = PrivacyConfig(privacy_config_path)
         
         # Mac OS integration
-        self.system = platform.system()
+        self.system = _system()
         # self.system = "Darwin" # testing
         if self.system == "Darwin":  # macOS
             self.coordinator = MacOSCoordinator(self.privacy_config, self.hotkeys, "src/utils/activity/compositor/mackeyserver")
@@ -40,14 +78,15 @@ class ActivityManager:
             self.compositor = self._get_compositor()
             self.input_tracker = self._get_input_tracker()
 
-        self.hotkey_actions: Dict[HotkeyEventType, List[Callable]] = {}
+        self.hotkey_actions: Dict[HotkeyEventType, Tuple[Callable, ...]] = {}
         self.screen_capture = self._get_screen_capture()
         self.audio_recorder = AudioRecorder()
+        self._input_task: Optional[asyncio.Task] = None
 
     def _get_compositor(self) -> BaseCompositor:
         """Detect and return the appropriate compositor instance."""
         if self.system == "Linux":
-            if "HYPRLAND_INSTANCE_SIGNATURE" in platform.os.environ:
+            if "HYPRLAND_INSTANCE_SIGNATURE" in os.environ:
                 return HyprlandCompositor()
         elif self.system == "Darwin":
             return self.coordinator.compositor if self.coordinator else None
@@ -57,46 +96,33 @@ class ActivityManager:
         )
 
     def _get_input_tracker(self) -> BaseInputTracker:
-        """Detect and return the appropriate compositor instance."""
-        if self.system == "Linux":
-            # Check if it's Wayland or X11, you might need a better detection method
-            if "WAYLAND_DISPLAY" in os.environ:
-                return EvdevInputTracker(self.compositor, self.privacy_config, self.hotkeys)
-            else:
-                return PynputInputTracker(self.compositor, self.privacy_config, self.hotkeys)
-        elif self.system == "Windows":
-            return PynputInputTracker(self.compositor, self.privacy_config, self.hotkeys)
-        elif self.system == "Darwin":  # macOS
+        """Return the input tracker instance for this platform."""
+        if self.system == "Darwin":  # macOS
             return self.coordinator.input_tracker if self.coordinator else None
-        else:
+        if _INPUT_TRACKER_CLS is None:
             raise NotImplementedError(f"Input tracker not supported on {self.system}")
+        return _INPUT_TRACKER_CLS(self.compositor, self.privacy_config, self.hotkeys)
     
     def _get_screen_capture(self, backend: Optional[str] = None) -> ScreenCapture:
         """Get the screen capture instance."""
         if backend is None:
-            if self.system == "Linux":
-                # Check if it's Wayland or X11, you might need a better detection method
-                if "WAYLAND_DISPLAY" in os.environ:
-                    backend = "grim"  # Default for Wayland
-                else:
-                    backend = "mss"  # Fallback for X11 or if detection fails
-            elif self.system == "Windows":
-                backend = "mss"
-            elif self.system == "Darwin":  # macOS
-                backend = "mss"
-            else:
+            backend = _DEFAULT_SCREEN_BACKEND
+            if backend is None:
                 raise NotImplementedError(f"Screen capture backend not specified for {self.system}")
 
         return ScreenCapture(self.compositor, self.privacy_config, backend=backend, video_duration=self.video_duration)
 
     async def start_recording(self):
         """Start video, audio recording, and input tracking."""
+        starts = [
+            self.screen_capture.start_recording(),
+            self.audio_recorder.start_recording(),
+        ]
         if self.system == "Darwin" and self.coordinator:
-            await self.coordinator.start()
-        await self.screen_capture.start_recording()
-        await self.audio_recorder.start_recording()
+            starts.append(self.coordinator.start())
+        await asyncio.gather(*starts)
         if self.input_tracker and not self.input_tracker.is_running:
-            asyncio.create_task(self.input_tracker.start())
+            self._input_task = asyncio.create_task(self.input_tracker.start(), name="input_tracker")
 
     async def stop_recording(self):
         """Stop video, audio recording, and input tracking.
@@ -107,9 +133,11 @@ class ActivityManager:
         if self.input_tracker and self.input_tracker.is_running:
             await self.input_tracker.stop()
             
-        audio_filepath = await self.audio_recorder.stop_recording()
-        video_buffer = await self.screen_capture.get_video_buffer()
-        window_sessions = await self.input_tracker.get_events()
+        audio_filepath, video_buffer, window_sessions = await asyncio.gather(
+            self.audio_recorder.stop_recording(),
+            self.screen_capture.get_video_buffer(),
+            self.input_tracker.get_events(),
+        )
 
         # Stop the coordinator if it's a macOS system
         if self.system == "Darwin" and self.coordinator:
@@ -129,9 +157,8 @@ class ActivityManager:
             else:
                 await self.stop_recording()
         elif event.hotkey_type in self.hotkey_actions:
-            # Execute all actions associated with the hotkey type
-            for action in self.hotkey_actions[event.hotkey_type]:
-                await action() # Assuming actions are async functions
+            # Run all actions associated with the hotkey type concurrently
+            await asyncio.gather(*(action() for action in self.hotkey_actions[event.hotkey_type])) # Assuming actions are async functions
 
     async def capture_screenshot(self) -> Optional[str]:
         """Capture a single screenshot and return the base64 encoded image."""
@@ -165,7 +192,7 @@ class ActivityManager:
 
     def get_audio_filepath(self) -> Optional[Path]:
         """Get the filepath of the last recorded audio file."""
-        return self.audio_recorder.filepath if hasattr(self.audio_recorder, "filepath") else None
+        return self.audio_recorder.filepath
 
     def get_video_buffer(self) -> Optional[bytes]:
         """Get the video buffer from the ScreenCapture."""
@@ -183,9 +210,7 @@ class ActivityManager:
         """Registers a hotkey action with the InputTracker.
         Hotkeys are registered to the input tracker when it is started.
         """
-        if hotkey_type not in self.hotkey_actions:
-            self.hotkey_actions[hotkey_type] = []
-        self.hotkey_actions[hotkey_type].append(callback)
+        self.hotkey_actions[hotkey_type] = self.hotkey_actions.get(hotkey_type, ()) + (callback,)
 
         # Update input tracker's hotkeys
         self.input_tracker.hotkeys[hotkey_type] = hotkey
@@ -199,5 +224,9 @@ class ActivityManager:
                 await self.compositor.cleanup()
             if self.input_tracker and self.input_tracker.is_running:
                 await self.input_tracker.stop()
+        if self._input_task and not self._input_task.done():
+            self._input_task.cancel()
+            await asyncio.gather(self._input_task, return_exceptions=True)
+        self._input_task = None
         await self.screen_capture.cleanup()
         await self.audio_recorder.cleanup()
\ No newline at end of file
@@ -1,14 +1,27 @@
 # src/utils/activity/compositor/hyprland.py
 import json
 import asyncio
+import functools
 import logging
 import os
-from typing import Dict, List, Optional, Any, Callable
+import subprocess
+import sys
+import time
+from typing import Awaitable, Dict, List, Optional, Any, Callable
 
 from src.utils.activity.compositor.base_compositor import BaseCompositor
 
 logger = logging.getLogger(__name__)
 
+# IPC event tags after which the set of visible workspaces may have changed
+_WORKSPACE_EVENTS = (
+    'workspace', 'workspacev2',
+    'moveworkspace', 'moveworkspacev2',
+    'createworkspace', 'createworkspacev2',
+    'destroyworkspace', 'destroyworkspacev2',
+    'monitoradded', 'monitoraddedv2', 'monitorremoved'
+)
+
 class HyprlandCompositor(BaseCompositor):
     """Compositor implementation for Hyprland."""
 
@@ -41,6 +54,22 @@ class HyprlandCompositor(BaseCompositor):
         ("zathura",): "Zathura - PDF Viewer",
     }
 
+    # Flattened (pattern, class_name) pairs, checked in mapping order
+    _WINDOW_CLASS_PATTERNS = tuple(
+        (pattern, class_name)
+        for patterns, class_name in WINDOW_CLASS_MAPPINGS.items()
+        for pattern in patterns
+    )
+
+    # Burst callers within this window share one IPC round-trip
+    WINDOWS_CACHE_TTL = 0.05
+
+    # StreamReader buffer limit for the event socket (bytes)
+    IPC_READ_LIMIT = 2 ** 20
+
+    # Focus changes within this window are coalesced into the last one
+    FOCUS_DEBOUNCE = 0.025
+
     def __init__(self) -> None:
         """Initialize Hyprland compositor interface."""
         self.running = False
@@ -48,31 +77,68 @@ class HyprlandCompositor(BaseCompositor):
         self._socket_task: Optional[asyncio.Task] = None
         self._socket_reader: Optional[asyncio.StreamReader] = None
         self._socket_writer: Optional[asyncio.StreamWriter] = None
+        self._pending_focus: Optional[Dict[str, Any]] = None
+        self._focus_flush_task: Optional[asyncio.Task] = None
+        # Set to cut short the back-off after an event processing error
+        self._retry = asyncio.Event()
         self.active_workspaces = set()
+        # Once synced, active_workspaces is kept current by workspace events
+        self._active_workspaces_synced = False
+        self._windows_cache: Optional[List[Dict[str, Any]]] = None
+        self._windows_cache_time = 0.0
+
+        # Event lines are "<tag>>><payload>"; dispatch on the tag
+        self._event_handlers: Dict[str, Callable[[str], Awaitable[None]]] = {
+            'activewindow': self._handle_active_window_event,
+            **dict.fromkeys(_WORKSPACE_EVENTS, self._handle_workspace_event),
+        }
+
+        # Hyprland's request socket (.socket.sock) answers hyprctl queries
+        # without spawning a process; the event socket lives next to it
+        his = os.environ.get("HYPRLAND_INSTANCE_SIGNATURE")
+        runtime_dir = os.environ.get("XDG_RUNTIME_DIR", "/run/user/1000")
+        self._socket_dir: Optional[str] = f"{runtime_dir}/hypr/{his}" if his else None
 
     def _get_window_class_name(self, window_class: str) -> str:
         """Get the classified window name based on the window class."""
-        if not window_class:
-            return "Unknown"
-            
-        window_class = window_class.lower()
-        
-        for patterns, class_name in self.WINDOW_CLASS_MAPPINGS.items():
-            if any(pattern in window_class for pattern in patterns):
-                return class_name
+        return _classify_window_class(window_class)
+
+    async def _query(self, command: str) -> Any:
+        """Run a hyprctl query and return its decoded JSON reply.
 
-        return window_class.title()
+        Uses the request socket directly and only falls back to spawning
+        hyprctl if the socket cannot be reached or its reply is empty or
+        not valid JSON (e.g. truncated). An empty hyprctl reply gives None.
+        """
+        if self._socket_dir:
+            try:
+                reader, writer = await asyncio.open_unix_connection(f"{self._socket_dir}/.socket.sock")
+                try:
+                    writer.write(f"j/{command}".encode())
+                    await writer.drain()
+                    # Hyprland closes the connection once the reply is sent
+                    reply = await reader.read()
+                finally:
+                    writer.close()
+                    await writer.wait_closed()
+                if not reply:
+                    raise ValueError("empty reply")
+                return json.loads(reply)
+            except (OSError, ValueError) as e:
+                # json.JSONDecodeError is a ValueError
+                logger.debug(f"Hyprland request socket query failed, falling back to hyprctl: {e}")
+
+        stdout = await asyncio.to_thread(
+            subprocess.check_output,
+            ["hyprctl", command, "-j"],
+            stderr=subprocess.DEVNULL
+        )
+        return json.loads(stdout) if stdout else None
 
     async def update_active_workspaces(self) -> None:
         """Update the set of active workspaces across all monitors."""
         try:
-            proc = await asyncio.create_subprocess_exec(
-                "hyprctl", "monitors", "-j",
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE
-            )
-            stdout, _ = await proc.communicate()
-            monitors = json.loads(stdout.decode())
+            monitors = await self._query("monitors")
             
             new_active_workspaces = set()
             for monitor in monitors:
@@ -81,37 +147,51 @@ class HyprlandCompositor(BaseCompositor):
                     new_active_workspaces.add(workspace_id)
             
             self.active_workspaces = new_active_workspaces
+            self._active_workspaces_synced = True
             
         except Exception as e:
             logger.error(f"Failed to update active workspaces: {e}")
 
     async def get_windows(self) -> List[Dict[str, Any]]:
-        """Update the current window state."""
+        """Get the current window state, reusing a very recent snapshot."""
+        now = time.monotonic()
+        if self._windows_cache is not None and now - self._windows_cache_time < self.WINDOWS_CACHE_TTL:
+            return self._windows_cache
+
+        windows = await self._fetch_windows()
+        self._windows_cache = windows
+        self._windows_cache_time = now
+        return windows
+
+    def _invalidate_windows_cache(self) -> None:
+        """Drop the cached window snapshot after a layout change."""
+        self._windows_cache = None
+
+    async def _fetch_windows(self) -> List[Dict[str, Any]]:
+        """Query Hyprland for the current window state."""
         await self.update_active_workspaces()
         windows: List[Dict[str, Any]] = []
         
         try:
-            proc = await asyncio.create_subprocess_exec(
-                "hyprctl", "clients", "-j",
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE
-            )
-            stdout, _ = await proc.communicate()
-            window_list = json.loads(stdout.decode())
+            window_list = await self._query("clients")
             
+            classify = self._get_window_class_name
+            append = windows.append
             for window_info in window_list:
-                workspace = window_info.get('workspace', {})
+                get = window_info.get
+                workspace = get('workspace', {})
                 workspace_id = workspace.get('id') if isinstance(workspace, dict) else workspace
+                # Window classes repeat across every snapshot, so share one string each
+                window_class = sys.intern(get('class') or '')
 
-                window_data = {
-                    'class': self._get_window_class_name(window_info.get('class', '')),
-                    'title': window_info.get('title', ''),
-                    'original_class': window_info.get('class', ''),
-                    'position': window_info.get('at', [0, 0]),
-                    'size': window_info.get('size', [0, 0]),
+                append({
+                    'class': classify(window_class),
+                    'title': get('title', ''),
+                    'original_class': window_class,
+                    'position': get('at', [0, 0]),
+                    'size': get('size', [0, 0]),
                     'workspace': workspace_id,
-                }
-                windows.append(window_data)
+                })
                     
         except Exception as e:
             logger.error(f"Failed to update windows: {e}")
@@ -121,25 +201,16 @@ class HyprlandCompositor(BaseCompositor):
     async def get_active_window(self) -> Optional[Dict[str, Any]]:
         """Get currently focused window info."""
         try:
-            proc = await asyncio.create_subprocess_exec(
-                "hyprctl", "activewindow", "-j",
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE
-            )
-            stdout, _ = await proc.communicate()
-            
-            if not stdout:
-                return None
-            
-            window_data = json.loads(stdout.decode())
+            window_data = await self._query("activewindow")
             
             if not window_data:
                 return None
 
+            window_class = sys.intern(window_data.get("class") or "")
             return {
-                "class": self._get_window_class_name(window_data.get("class", "")),
+                "class": self._get_window_class_name(window_class),
                 "title": window_data.get("title", ""),
-                "original_class": window_data.get("class", "")
+                "original_class": window_class
             }
 
         except Exception as e:
@@ -150,13 +221,11 @@ class HyprlandCompositor(BaseCompositor):
         """Set up focus change tracking using Hyprland's IPC socket."""
         self._focus_callback = callback
         try:
-            his = os.environ.get("HYPRLAND_INSTANCE_SIGNATURE")
-            if not his:
+            if not self._socket_dir:
                 logger.error("HYPRLAND_INSTANCE_SIGNATURE not found in environment")
                 return
 
-            runtime_dir = os.environ.get("XDG_RUNTIME_DIR", "/run/user/1000")
-            socket_path = f"{runtime_dir}/hypr/{his}/.socket2.sock"
+            socket_path = f"{self._socket_dir}/.socket2.sock"
 
             self.running = True
             self._socket_task = asyncio.create_task(self._listen_for_events(socket_path))
@@ -167,48 +236,30 @@ class HyprlandCompositor(BaseCompositor):
     async def _listen_for_events(self, socket_path: str) -> None:
         """Listen for events from Hyprland's IPC socket."""
         try:
-            reader, writer = await asyncio.open_unix_connection(socket_path)
+            reader, writer = await asyncio.open_unix_connection(socket_path, limit=self.IPC_READ_LIMIT)
             self._socket_reader = reader
             self._socket_writer = writer
 
             while self.running:
                 try:
-                    data = await reader.read(1024)
+                    # Let the StreamReader handle framing so events split
+                    # across reads are reassembled rather than dropped
+                    data = await reader.readline()
                     if not data:
-                        continue
-
-                    decoded = data.decode()
-                    for line in decoded.strip().split('\n'):
-                        if line.startswith('activewindow>>'):
-                            _, window_info = line.split('>>', 1)
-                            if ',' in window_info:
-                                window_class, window_title = window_info.split(',', 1)
-                            else:
-                                window_class = window_info
-                                window_title = ""
-
-                            class_name = self._get_window_class_name(window_class)
-
-                            if self._focus_callback:
-                                await self._focus_callback({
-                                    "class": class_name,
-                                    "title": window_title,
-                                    "original_class": window_class
-                                })
-                            await self.update_active_workspaces()
-                        elif any(line.startswith(event) for event in [
-                            'workspace>>', 'workspacev2>>', 
-                            'moveworkspace>>', 'moveworkspacev2>>',
-                            'createworkspace>>', 'createworkspacev2>>',
-                            'destroyworkspace>>', 'destroyworkspacev2>>'
-                        ]):
-                            await self.update_active_workspaces()
+                        logger.warning("Hyprland IPC socket closed")
+                        break
+
+                    line = data.decode('utf-8', 'replace').rstrip('\n')
+                    tag, sep, payload = line.partition('>>')
+                    handler = self._event_handlers.get(tag) if sep else None
+                    if handler:
+                        await handler(payload)
 
                 except Exception as e:
                     logger.error(f"Error processing socket data: {e}")
                     if not self.running:
                         break
-                    await asyncio.sleep(1)
+                    await self._wait_for_retry()
 
         except Exception as e:
             logger.error(f"IPC socket error: {e}")
@@ -218,6 +269,57 @@ class HyprlandCompositor(BaseCompositor):
                 self._socket_writer.close()
                 await self._socket_writer.wait_closed()
 
+    async def _handle_active_window_event(self, window_info: str) -> None:
+        """Queue a focus change from an activewindow>>class,title event."""
+        self._invalidate_windows_cache()
+        # No comma leaves window_title empty
+        window_class, _, window_title = window_info.partition(',')
+        window_class = sys.intern(window_class or '')
+
+        class_name = self._get_window_class_name(window_class)
+
+        # Only the latest focus within the debounce window is delivered
+        self._pending_focus = {
+            "class": class_name,
+            "title": window_title,
+            "original_class": window_class
+        }
+        if self._focus_flush_task is None or self._focus_flush_task.done():
+            self._focus_flush_task = asyncio.create_task(self._flush_focus_change())
+
+    async def _handle_workspace_event(self, payload: str) -> None:
+        """Resync visible workspaces after a workspace or monitor change."""
+        self._invalidate_windows_cache()
+        await self.update_active_workspaces()
+
+    async def _wait_for_retry(self, timeout: float = 1.0) -> None:
+        """Back off after an error until request_retry() or the timeout."""
+        try:
+            await asyncio.wait_for(self._retry.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            pass
+        self._retry.clear()
+
+    def request_retry(self) -> None:
+        """Wake the event listener if it is backing off after an error."""
+        self._retry.set()
+
+    async def _flush_focus_change(self) -> None:
+        """Deliver the most recent focus change once a burst has settled."""
+        await asyncio.sleep(self.FOCUS_DEBOUNCE)
+        window_info, self._pending_focus = self._pending_focus, None
+        if window_info is None:
+            return
+
+        try:
+            if self._focus_callback:
+                await self._focus_callback(window_info)
+            # Focus changes alone never change which workspaces are shown
+            if not self._active_workspaces_synced:
+                await self.update_active_workspaces()
+        except Exception as e:
+            logger.error(f"Error handling focus change: {e}")
+
     def is_window_visible(self, window_info: Dict[str, Any]) -> bool:
         """Determine if a given window is currently visible on the screen."""
         return window_info.get('workspace') in self.active_workspaces
@@ -225,6 +327,10 @@ class HyprlandCompositor(BaseCompositor):
     async def cleanup(self) -> None:
         """Clean up IPC socket connection."""
         self.running = False
+        self.request_retry()
+        if self._focus_flush_task:
+            self._focus_flush_task.cancel()
+            self._focus_flush_task = None
         if self._socket_task:
             self._socket_task.cancel()
             try:
@@ -233,4 +339,23 @@ class HyprlandCompositor(BaseCompositor):
                 pass
         if self._socket_writer:
             self._socket_writer.close()
-            await self._socket_writer.wait_closed()
\ No newline at end of file
+            await self._socket_writer.wait_closed()
+
+
+@functools.lru_cache(maxsize=512)
+def _classify_window_class(window_class: str) -> str:
+    """Classify a raw window class; cached since classes repeat constantly."""
+    if not window_class:
+        return "Unknown"
+
+    window_class = window_class.lower()
+
+    for pattern, class_name in HyprlandCompositor._WINDOW_CLASS_PATTERNS:
+        if pattern in window_class:
+            return class_name
+
+    # Single lowercase ASCII word (the usual case, e.g. "firefox"):
+    # title() would only upper-case the first letter
+    if window_class.isascii() and window_class.isalpha():
+        return window_class[0].upper() + window_class[1:]
+    return window_class.title()
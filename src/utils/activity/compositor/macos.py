@@ -1,7 +1,7 @@
 import asyncio
 import json
 import logging
-from typing import Dict, List, Any, Optional, Callable
+from typing import Dict, List, Any, Optional, Callable, Set
 
 from src.utils.activity.compositor.base_compositor import BaseCompositor
 
@@ -10,6 +10,10 @@ logger = logging.getLogger(__name__)
 class MacOSCompositor(BaseCompositor):
     def __init__(self):
         self.window_info: Dict[str, Any] = {"active": None, "all": []}
+        self._visible_window_numbers: Set[int] = set()
+        # ids of the dicts in window_info["all"]; they stay alive (and their
+        # ids unique) for as long as that list is current
+        self._visible_window_ids: Set[int] = set()
         self._tasks: List[asyncio.Task] = []
         self._focus_callback: Optional[Callable[[Dict[str, Any]], None]] = None
 
@@ -29,14 +33,24 @@ class MacOSCompositor(BaseCompositor):
         """Sets up focus change tracking."""
         self._focus_callback = callback
 
+    def update_windows(self, windows: List[Dict[str, Any]]) -> None:
+        """Replace the list of on-screen windows reported by MacKeyServer."""
+        self.window_info["all"] = windows
+        self._visible_window_numbers = {window.get("windowNumber") for window in windows}
+        self._visible_window_ids = {id(window) for window in windows}
+
     def is_window_visible(self, window_info: Dict[str, Any]) -> bool:
         """Determine if a given window is currently visible on the screen."""
-        all_windows = self.window_info.get("all", [])
-        return any(window == window_info for window in all_windows)
+        # Callers usually pass the dicts returned by get_windows() back in
+        if id(window_info) in self._visible_window_ids:
+            return True
+        return window_info.get("windowNumber") in self._visible_window_numbers
 
     async def cleanup(self):
         """Cleans up resources."""
         for task in self._tasks:
             task.cancel()
         await asyncio.gather(*self._tasks, return_exceptions=True)
-        self.window_info = {"active": None, "all": []}
\ No newline at end of file
+        self.window_info = {"active": None, "all": []}
+        self._visible_window_numbers = set()
+        self._visible_window_ids = set()
\ No newline at end of file
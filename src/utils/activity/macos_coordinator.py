@@ -1,4 +1,3 @@
-import subprocess
 import asyncio
 import json
 import logging
@@ -14,6 +13,10 @@ from src.utils.activity.compositor.macosevent import EventType
 logger = logging.getLogger(__name__)
 
 class MacOSCoordinator:
+    # StreamReader buffer limit for MacKeyServer output; window lists are
+    # sent as a single JSON line
+    STDOUT_READ_LIMIT = 2 ** 20
+
     def __init__(
         self,
         privacy_config: PrivacyConfig,
@@ -21,53 +24,61 @@ class MacOSCoordinator:
         mackeyserver_path: str,
     ):
         self.mackeyserver_path = mackeyserver_path
-        self.process: Optional[subprocess.Popen] = None
+        self.process: Optional[asyncio.subprocess.Process] = None
         self.privacy_config = privacy_config
         self.hotkeys = hotkeys
         self.stopping = False
-        self.initial_session_created = False
+        # Identity of the last ACTIVE window, so re-emitted focus events
+        # don't open a new session
+        self._last_active_key: Optional[Tuple[Any, ...]] = None
+        self._tasks: List[asyncio.Task] = []
+
+        # CSV input event parsers, keyed by the event type tag
+        self._input_parsers = {
+            "CHARACTER": self._parse_key_fields,
+            "SPECIAL_KEY": self._parse_key_fields,
+            "MODIFIER": self._parse_modifier_fields,
+            "MOUSE": self._parse_mouse_fields,
+        }
 
         logger.info(
             f"Starting MacOSCoordinator with mackeyserver at {self.mackeyserver_path}"
         )
-        try:
-            self.process = subprocess.Popen(
-                ["python", self.mackeyserver_path],
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                universal_newlines=False,
-            )
-        except Exception as e:
-            logger.error(f"Failed to start MacKeyServer: {e}", exc_info=True)
-            return
 
         self.compositor = MacOSCompositor()
         self.input_tracker = MacOSInputTracker(
             self.compositor, self.privacy_config, self.hotkeys
         )
 
-        self._stdout_reader = asyncio.StreamReader()
-        self._stderr_reader = asyncio.StreamReader()
-
     async def start(self):
         """Starts the MacKeyServer and initializes the compositor and input tracker."""
-        loop = asyncio.get_event_loop()
-
-        # Create StreamReader instances for stdout and stderr
-        loop.create_task(
-            self._create_stream_reader(self.process.stdout, self._stdout_reader)
-        )
-        loop.create_task(
-            self._create_stream_reader(self.process.stderr, self._stderr_reader)
-        )
+        self.stopping = False
+        self._last_active_key = None
+        try:
+            # The loop reads the pipes natively, so a wakeup drains every
+            # line that is already buffered
+            self.process = await asyncio.create_subprocess_exec(
+                "python",
+                self.mackeyserver_path,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+                limit=self.STDOUT_READ_LIMIT,
+            )
+        except Exception as e:
+            logger.error(f"Failed to start MacKeyServer: {e}", exc_info=True)
+            return
 
         # Setup focus tracking (make sure this is done before starting compositor)
         await self.compositor.setup_focus_tracking(
             self.input_tracker._on_window_focus_change
         )
 
-        # Start the event processing task
-        asyncio.create_task(self._process_events())
+        # Start the event processing task, and keep stderr drained so the
+        # server never blocks on a full pipe
+        self._tasks = [
+            asyncio.create_task(self._process_events()),
+            asyncio.create_task(self._drain_stderr()),
+        ]
 
         # Start compositor and input tracker
         await self.compositor.start()
@@ -81,45 +92,31 @@ class MacOSCoordinator:
             await self.input_tracker.stop()
         if self.compositor:
             await self.compositor.cleanup()
-        if self.process:
+        if self.process and self.process.returncode is None:
             self.process.terminate()
             try:
-                self.process.wait(timeout=5.0)
-            except subprocess.TimeoutExpired:
+                await asyncio.wait_for(self.process.wait(), timeout=5.0)
+            except asyncio.TimeoutError:
                 logger.warning("MacKeyServer did not terminate gracefully, killing it")
                 self.process.kill()
-            finally:
-                if self.process.returncode is None:
-                    self.process.wait()
-
-    async def _create_stream_reader(self, stream, reader):
-        """Setup a StreamReader and start reading from a stream."""
-        loop = asyncio.get_event_loop()
-        loop.add_reader(stream.fileno(), self._read_from_stream, stream, reader)
-
-    def _read_from_stream(self, stream, reader):
-        """Callback to read data from a stream and feed it to a StreamReader."""
-        data = stream.read1(4096)
-        if data:
-            reader.feed_data(data)
-        else:
-            reader.feed_eof()
+                await self.process.wait()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _drain_stderr(self):
+        """Reads MacKeyServer's stderr and logs it at debug level."""
+        async for line in self.process.stderr:
+            logger.debug(f"MacKeyServer: {line.decode('utf-8', 'replace').rstrip()}")
 
     async def _process_events(self):
         """Processes events from the stdout of the MacKeyServer."""
-        while not self.stopping:
-            line = await self._stdout_reader.readline()
-            if not line:
-                if self.process.poll() is not None:
-                    logger.info(
-                        "MacKeyServer process has terminated. Stopping listener."
-                    )
-                    break
-                else:
-                    await asyncio.sleep(0.1)
-                    continue
+        # Iteration ends at EOF, i.e. when the server exits or stop()
+        # terminates it; no polling of the process is needed
+        async for line in self.process.stdout:
+            if self.stopping:
+                break
             try:
-                event_type, data = self._parse_event_line(line.decode("utf-8").strip())
+                event_type, data = self._parse_event_line(line.strip())
                 # logger.debug(f"Received event: {event_type}, data: {data}")
 
                 if event_type in [EventType.WINDOW_INFO, EventType.APPLICATION]:
@@ -128,15 +125,24 @@ class MacOSCoordinator:
                     await self.input_tracker._process_event(event_type, data)
 
             except (ValueError, json.JSONDecodeError) as e:
-                logger.error(f"Error processing line: {line}. Error: {e}")
+                logger.error(f"Error processing line: {line.decode('utf-8', 'replace').rstrip()}. Error: {e}")
             except Exception as e:
                 logger.error(f"An unexpected error occurred: {e}")
 
-    def _parse_event_line(self, line: str) -> Tuple[EventType, Dict[str, Any]]:
-        """Parses a line of event data from MacKeyServer."""
-        parts = line.split(",", 1)
-        if len(parts) == 2:
-            event_type_str, rest = parts
+        returncode = await self.process.wait()
+        logger.info(
+            f"MacKeyServer process has terminated (exit code {returncode}). Stopping listener."
+        )
+
+    def _parse_event_line(self, line: bytes) -> Tuple[EventType, Dict[str, Any]]:
+        """Parses a raw line of event data from MacKeyServer.
+
+        The line stays as bytes until its type is known, so JSON payloads are
+        parsed without first decoding the whole line into a str.
+        """
+        event_type_bytes, sep, rest = line.partition(b",")
+        if sep:
+            event_type_str = event_type_bytes.decode("utf-8")
             try:
                 event_type = EventType(event_type_str)
             except ValueError:
@@ -144,7 +150,7 @@ class MacOSCoordinator:
 
             if event_type in [EventType.APPLICATION, EventType.WINDOW_INFO]:
                 try:
-                    json_data, event_id = rest.rsplit(",", 1)
+                    json_data, _, event_id = rest.rpartition(b",")
                     data = json.loads(json_data)
                     data["event_id"] = int(event_id)
                     return event_type, data
@@ -153,71 +159,76 @@ class MacOSCoordinator:
                         f"Error parsing JSON for event type {event_type_str}: {e}"
                     )
             else:
-                data = self._parse_input_event(event_type_str, rest)
+                data = self._parse_input_event(event_type_str, rest.decode("utf-8"))
                 return event_type, data
         else:
-            raise ValueError(f"Invalid line format received: {line}")
+            raise ValueError(f"Invalid line format received: {line.decode('utf-8', 'replace').rstrip()}")
 
     def _parse_input_event(self, event_type_str: str, rest: str) -> Dict[str, Any]:
         """Parses event data for input events (non-JSON)."""
         parts = rest.split(",")
-        data = {}
 
         try:
             event_id = int(parts[-1])
-            data["event_id"] = event_id
-            parts = parts[:-1]  # Remove event_id from parts
-
-            if event_type_str == "CHARACTER":
-                # Format: CHARACTER,DOWN/UP,char,x,y,modifiers,event_id
-                data["type"] = "CHARACTER"
-                data["action"] = parts[0]
-                data["key"] = parts[1]
-                data["x"] = float(parts[2])
-                data["y"] = float(parts[3])
-                data["modifiers"] = parts[4]
-            elif event_type_str == "SPECIAL_KEY":
-                # Format: SPECIAL_KEY,DOWN/UP,key_name,x,y,modifiers,event_id
-                data["type"] = "SPECIAL_KEY"
-                data["action"] = parts[0]
-                data["key"] = parts[1]
-                data["x"] = float(parts[2])
-                data["y"] = float(parts[3])
-                data["modifiers"] = parts[4]
-            elif event_type_str == "MODIFIER":
-                # Format: MODIFIER,KeyCode,DOWN/UP,x,y,event_id,flags
-                data["type"] = "MODIFIER"
-                data["modifier"] = parts[0]
-                data["state"] = parts[1]
-                data["x"] = float(parts[2])
-                data["y"] = float(parts[3])
-                data["flags"] = parts[4] if len(parts) > 4 else ""
-            elif event_type_str == "MOUSE":
-                # Format: MOUSE,DOWN/UP/MOVE/SCROLL,button,x,y,event_id (button is 0 for left, 1 for right, 2 for middle, etc.)
-                # Format: MOUSE,SCROLL,delta,x,y,event_id
-                # Format: MOUSE,MOVE,x,y,event_id
-                data["type"] = "MOUSE"
-                data["action"] = parts[0]
-                if parts[0] == "SCROLL":
-                    data["delta"] = int(parts[1]) if parts[1].isdigit() else parts[1]
-                    data["x"] = float(parts[2])
-                    data["y"] = float(parts[3])
-                elif parts[0] == "MOVE":
-                    data["x"] = float(parts[1])
-                    data["y"] = float(parts[2])
-                else:
-                    data["button"] = int(parts[1]) if parts[1].isdigit() else parts[1]
-                    data["x"] = float(parts[2])
-                    data["y"] = float(parts[3])
-            else:
+            parser = self._input_parsers.get(event_type_str)
+            if parser is None:
                 logger.warning(
                     f"Unknown event type for CSV parsing: {event_type_str}"
                 )
+                return {"event_id": event_id}
+            return parser(event_type_str, event_id, parts[:-1])  # Drop the event_id field
 
         except (ValueError, IndexError) as e:
             logger.error(f"Error parsing CSV event data: {rest}. Error: {e}")
             return {}
 
+    @staticmethod
+    def _parse_key_fields(event_type_str: str, event_id: int, parts: List[str]) -> Dict[str, Any]:
+        """CHARACTER/SPECIAL_KEY,DOWN/UP,key,x,y,modifiers,event_id"""
+        return {
+            "event_id": event_id,
+            "type": event_type_str,
+            "action": parts[0],
+            "key": parts[1],
+            "x": float(parts[2]),
+            "y": float(parts[3]),
+            "modifiers": parts[4],
+        }
+
+    @staticmethod
+    def _parse_modifier_fields(event_type_str: str, event_id: int, parts: List[str]) -> Dict[str, Any]:
+        """MODIFIER,KeyCode,DOWN/UP,x,y,flags,event_id"""
+        return {
+            "event_id": event_id,
+            "type": "MODIFIER",
+            "modifier": parts[0],
+            "state": parts[1],
+            "x": float(parts[2]),
+            "y": float(parts[3]),
+            "flags": parts[4] if len(parts) > 4 else "",
+        }
+
+    @staticmethod
+    def _parse_mouse_fields(event_type_str: str, event_id: int, parts: List[str]) -> Dict[str, Any]:
+        """MOUSE,DOWN/UP,button,x,y,event_id | MOUSE,SCROLL,delta,x,y,event_id | MOUSE,MOVE,x,y,event_id
+
+        button is 0 for left, 1 for right, 2 for middle, etc. button and
+        delta are always integers (delta may be negative); anything else
+        raises ValueError, which _parse_input_event reports.
+        """
+        action = parts[0]
+        data = {"event_id": event_id, "type": "MOUSE", "action": action}
+        if action == "SCROLL":
+            data["delta"] = int(parts[1])
+            data["x"] = float(parts[2])
+            data["y"] = float(parts[3])
+        elif action == "MOVE":
+            data["x"] = float(parts[1])
+            data["y"] = float(parts[2])
+        else:
+            data["button"] = int(parts[1])
+            data["x"] = float(parts[2])
+            data["y"] = float(parts[3])
         return data
 
     async def _handle_window_or_application_event(
@@ -227,13 +238,17 @@ class MacOSCoordinator:
         if event_type == EventType.WINDOW_INFO:
             if data["kind"] == "ACTIVE":
                 self.compositor.window_info["active"] = data
-                if not self.initial_session_created:
-                    await self.input_tracker._on_window_focus_change(data)
-                    self.initial_session_created = True
-                else:
-                    await self.input_tracker._on_window_focus_change(data)
+                key = (
+                    data.get("windowNumber"),
+                    data.get("ownerName"),
+                    data.get("windowName"),
+                )
+                if key == self._last_active_key:
+                    return
+                self._last_active_key = key
+                await self.input_tracker._on_window_focus_change(data)
             elif data["kind"] == "ALL":
-                self.compositor.window_info["all"] = data
+                self.compositor.update_windows(data.get("data", []))
         elif event_type == EventType.APPLICATION:
             # You might not need a separate application event handler if
             # window focus changes are handled correctly.
@@ -2,6 +2,8 @@
 
 import asyncio
 from io import BytesIO
+import queue
+import threading
 import sounddevice as sd
 import soundfile as sf
 import numpy as np
@@ -16,7 +18,7 @@ logger = get_logger(__name__)
 
 class AudioRecorder:
     """Handles audio recording functionality."""
-    
+
     def __init__(self, sample_rate: int = 44100, channels: int = 1):
         """Initialize audio recorder.
         
@@ -24,13 +26,19 @@ class AudioRecorder:
             sample_rate: Recording sample rate (Hz)
             channels: Number of audio channels (1 for mono, 2 for stereo)
         """
-        self.logger = get_logger(__name__)
         self.sample_rate = sample_rate
         self.channels = channels
         self.recording = None
         self.is_recording = False
         self.stream = None
-        self._recorded_frames = []
+        self.filepath: Optional[Path] = None
+
+        # Frames are streamed to disk by a writer thread while recording
+        self._sound_file: Optional[sf.SoundFile] = None
+        self._pending_filepath: Optional[Path] = None
+        self._queue: "queue.SimpleQueue[Optional[np.ndarray]]" = queue.SimpleQueue()
+        self._writer: Optional[threading.Thread] = None
+        self._frame_count = 0
 
     async def start_recording(self):
         """Start recording audio."""
@@ -38,7 +46,25 @@ class AudioRecorder:
             return
 
         try:
-            self._recorded_frames = []
+            # Create recordings directory if it doesn't exist
+            recordings_dir = Path("recordings")
+            recordings_dir.mkdir(exist_ok=True)
+            
+            # Generate filename with timestamp
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            self._pending_filepath = recordings_dir / f"recording_{timestamp}.wav"
+
+            # Open the WAV once and let the writer thread append PCM frames
+            self._sound_file = sf.SoundFile(
+                str(self._pending_filepath),
+                mode="w",
+                samplerate=self.sample_rate,
+                channels=self.channels,
+                subtype="PCM_16"
+            )
+            self._frame_count = 0
+            self._writer = threading.Thread(target=self._write_frames, daemon=True)
+            self._writer.start()
             self.is_recording = True
 
             # Create and start the stream
@@ -51,6 +77,14 @@ class AudioRecorder:
 
         except Exception as e:
             self.is_recording = False
+            if self.stream:
+                self.stream.close()
+                self.stream = None
+            # Close and remove the WAV opened for this attempt
+            await self._close_writer()
+            if self._pending_filepath:
+                self._pending_filepath.unlink(missing_ok=True)
+                self._pending_filepath = None
             raise RuntimeError(f"Failed to start recording: {str(e)}")
 
     async def stop_recording(self) -> Optional[Path]:
@@ -69,42 +103,49 @@ class AudioRecorder:
                 self.stream.stop()
                 self.stream.close()
                 self.stream = None
+                
+            # Flush the remaining frames and finalize the WAV header
+            filepath = self._pending_filepath
+            await self._close_writer()
 
-            if not self._recorded_frames:
+            if not self._frame_count:
+                filepath.unlink(missing_ok=True)
                 return None
 
-            # Convert recorded frames to numpy array
-            recording = np.concatenate(self._recorded_frames, axis=0)
-            
-            # Create recordings directory if it doesn't exist
-            recordings_dir = Path("recordings")
-            recordings_dir.mkdir(exist_ok=True)
-            
-            # Generate filename with timestamp
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filepath = recordings_dir / f"recording_{timestamp}.wav"
             self.filepath = filepath
-            
-            # Save recording
-            sf.write(
-                file=str(filepath),
-                data=recording,
-                samplerate=self.sample_rate
-            )
-            
             return filepath
 
         except Exception as e:
             raise RuntimeError(f"Failed to stop recording: {str(e)}")
         finally:
-            self._recorded_frames = []
+            self._pending_filepath = None
 
     def _audio_callback(self, indata, frames, time, status):
         """Callback function for audio stream."""
         if status:
             print(f'Audio callback status: {status}')
         if self.is_recording:
-            self._recorded_frames.append(indata.copy())
+            # PortAudio reuses indata between callbacks, so hand off a copy
+            self._queue.put_nowait(indata.copy())
+            self._frame_count += frames
+
+    def _write_frames(self):
+        """Writer thread: append queued frames to the open sound file."""
+        while True:
+            chunk = self._queue.get()
+            if chunk is None:
+                break
+            self._sound_file.write(chunk)
+
+    async def _close_writer(self):
+        """Stop the writer thread and close the sound file."""
+        if self._writer:
+            self._queue.put_nowait(None)
+            await asyncio.to_thread(self._writer.join)
+            self._writer = None
+        if self._sound_file:
+            self._sound_file.close()
+            self._sound_file = None
 
     async def cleanup(self):
         """Cleanup resources."""
@@ -116,6 +157,9 @@ class AudioRecorder:
                 self.stream.stop()
                 self.stream.close()
                 self.stream = None
+
+            # A partial start can leave the writer thread and file open
+            await self._close_writer()
                 
         except Exception as e:
-            raise RuntimeError(f"Failed to cleanup audio recorder: {str(e)}")
\ No newline at end of file
+            raise RuntimeError(f"Failed to cleanup audio recorder: {str(e)}")
@@ -1,4 +1,5 @@
 import abc
+import asyncio
 from typing import Dict, List, Any, Callable, Optional
 from src.utils.activity.trackers.session import WindowSession
 from src.utils.events import HotkeyEvent, HotkeyEventType, EventSystem
@@ -8,6 +9,20 @@ from src.utils.logging import get_logger
 
 logger = get_logger(__name__)
 
+# Either of these in pressed_keys selects the shifted variant of a key
+_SHIFT_KEYS = frozenset(("leftshift", "rightshift"))
+
+def _serialize_sessions(
+    pending: List[WindowSession], current: Optional[WindowSession]
+) -> List[Dict[str, Any]]:
+    """Build the window_sessions list for get_events (runs in a worker thread)."""
+    sessions = []
+    for session in pending:
+        session.append_to(sessions)
+    if current:
+        sessions.append(current.build_dict())
+    return sessions
+
 class BaseInputTracker(abc.ABC):
     """Abstract base class for input tracker implementations."""
 
@@ -113,62 +128,46 @@ class BaseInputTracker(abc.ABC):
         current_window = await self.compositor.get_active_window()
         # logger.debug(f"Current window: {current_window}")
         # logger.debug(f"Current session: {self.current_session}")
-        # logger.debug(f"Current session: {self.current_session.window_info if self.current_session else 'None'}, Key events: {self.current_session.key_events if self.current_session else 'None'}")
+        # logger.debug(f"Current session: {self.current_session.window_info if self.current_session else 'None'}, Key events: {self.current_session.key_count if self.current_session else 'None'}")
         # logger.debug(f"Pending sessions: {len(self.pending_sessions)}")
         # logger.debug(f"Total keys: {self._total_keys}, clicks: {self._total_clicks}, scrolls: {self._total_scrolls}")
 
-        # End current session and get the data
-        session_data = None
-        if self.current_session:
-            await self.current_session.end_session(datetime.now())
-            session_data = await self.current_session.to_dict()
+        # End the current session and snapshot everything due for the flush;
+        # these sessions are finished, so nothing mutates them from here on.
+        # Trackers record events from the event loop, so the swap and resets
+        # below are not interleaved with a writer.
+        current = self.current_session
+        if current:
+            await current.end_session(datetime.now())
             self.current_session = None
 
-        # Process pending sessions
-        sessions = []
-        for session in self.pending_sessions:
-            if self.privacy_config.is_private(session.window_info):
-                # Keep metadata but replace events with privacy filter
-                sessions.append({
-                    'window_class': session.window_info['class'],
-                    'window_title': session.window_info['title'],
-                    'duration': session.duration,
-                    'start_time': session.start_time.isoformat(),
-                    'end_time': session.end_time.isoformat(),
-                    'privacy_filtered': True,
-                    'key_count': session.key_count,
-                    'click_count': session.click_count,
-                    'scroll_count': session.scroll_count,
-                    'key_events': [],  # Empty events list
-                    'click_events': [],
-                    'scroll_events': []
-                })
-            else:
-                sessions.append(await session.to_dict())
-
-        if session_data:
-            sessions.append(session_data)
-
-        events = {
-            "window_sessions": sessions,
-            "counts": {
-                "total_keys_pressed": self._total_keys,
-                "total_clicks": self._total_clicks,
-                "total_scrolls": self._total_scrolls
-            },
-            "timestamp": datetime.now().isoformat()
+        pending, self.pending_sessions = self.pending_sessions, []
+        counts = {
+            "total_keys_pressed": self._total_keys,
+            "total_clicks": self._total_clicks,
+            "total_scrolls": self._total_scrolls
         }
+        timestamp = datetime.now().isoformat()
 
-        # Clear pending sessions and reset counters
-        self.pending_sessions = []
+        # Reset counters
         self._total_keys = 0
         self._total_clicks = 0
         self._total_scrolls = 0
 
-        # Create new session with the active window
+        # Create new session with the active window, so input arriving while
+        # the snapshot is serialized is recorded
         if current_window:
             await self._on_window_focus_change(current_window)
 
+        # Formatting the session dicts is pure CPU; keep it off the event loop
+        sessions = await asyncio.to_thread(_serialize_sessions, pending, current)
+
+        events = {
+            "window_sessions": sessions,
+            "counts": counts,
+            "timestamp": timestamp
+        }
+
         return events
 
     @abc.abstractmethod
@@ -189,17 +188,19 @@ class BaseInputTracker(abc.ABC):
     async def _on_window_focus_change(self, window_info: Dict[str, str]) -> None:
         """Handle window focus changes."""
         now = datetime.now()
+        is_private = self.privacy_config.is_private(window_info)
 
         # End current session if exists and add it to the list of sessions
         if self.current_session:
             await self.current_session.end_session(now)
             self.recent_sessions.append(self.current_session)
 
-            if self.should_persist and not self.privacy_config.is_private(window_info):
+            if self.should_persist and not is_private:
                 self.pending_sessions.append(self.current_session)
 
-        # Start new session
-        self.current_session = WindowSession(window_info, now)
+        # Start new session; its privacy is resolved once here rather than
+        # on every input event
+        self.current_session = WindowSession(window_info, now, is_private)
 
     async def get_recent_sessions(self, seconds: int = 60) -> List[WindowSession]:
         """Get recent sessions from buffer.
@@ -219,9 +220,10 @@ class BaseInputTracker(abc.ABC):
     async def _check_hotkeys(self):
         """Checks if a hotkey combination has been pressed."""
         # logger.debug(f"Checking hotkeys: {self.pressed_keys}")
+        pressed_keys = self.pressed_keys
         for hotkey_type, hotkey in self.hotkeys.items():
-            required_keys = set(hotkey)
-            if required_keys.issubset(self.pressed_keys):
+            # issuperset() walks the hotkey directly instead of copying it into a set
+            if pressed_keys.issuperset(hotkey):
                 # Hotkey detected, broadcast the event
                 await self.event_system.broadcaster.broadcast_hotkey(
                     HotkeyEvent(
@@ -232,11 +234,14 @@ class BaseInputTracker(abc.ABC):
 
     def _standardize_key_name(self, key_name: str) -> str:
         """Standardizes a key name using the KEY_MAP, considering shift keys, and smartly handling uppercase letters."""
-        key_name = key_name.lower()
+        return self._key_variant(key_name.lower(), self._is_shift_pressed())
 
-        # Determine if shift is pressed
-        shift_pressed = "leftshift" in self.pressed_keys or "rightshift" in self.pressed_keys
+    def _is_shift_pressed(self) -> bool:
+        """Whether either shift key is currently held."""
+        return not _SHIFT_KEYS.isdisjoint(self.pressed_keys)
 
+    def _key_variant(self, key_name: str, shift_pressed: bool) -> str:
+        """Standardize an already lower-cased key name for a given shift state."""
         # Handle uppercase letters smartly
         if shift_pressed and 'a' <= key_name <= 'z':
             standardized_key = key_name.upper()
@@ -1,8 +1,11 @@
 import asyncio
 import errno
 import logging
+import os
+import struct
+import time
 from datetime import datetime
-from typing import Dict, List, Optional, Any, Callable
+from typing import Dict, List, Optional, Any, Callable, Tuple
 from collections import deque
 
 import evdev
@@ -17,6 +20,42 @@ from src.utils.activity.trackers.inputs.baseinput import BaseInputTracker
 
 logger = logging.getLogger(__name__)
 
+# Event type and code constants used on the hot path, resolved once
+EV_KEY = ecodes.EV_KEY
+EV_REL = ecodes.EV_REL
+REL_WHEEL = ecodes.REL_WHEEL
+REL_HWHEEL = ecodes.REL_HWHEEL
+
+# struct input_event (timeval, type, code, signed value) in the native layout,
+# decoded straight from the device fd instead of through InputEvent objects
+_INPUT_EVENT = struct.Struct("llHHi")
+_READ_SIZE = _INPUT_EVENT.size * 64
+
+# EV_KEY codes that mark a device as a keyboard or a mouse
+_KEYBOARD_CODES = frozenset(range(ecodes.KEY_ESC, ecodes.KEY_MICMUTE + 1))
+_MOUSE_BUTTON_CODES = frozenset(range(ecodes.BTN_MOUSE, ecodes.BTN_TASK + 1))
+_TRACKED_KEY_CODES = _KEYBOARD_CODES | _MOUSE_BUTTON_CODES
+
+
+def _key_code_names(prefix: str) -> Dict[int, str]:
+    """Map each EV_KEY code whose primary evdev name starts with prefix to that name."""
+    names: Dict[int, str] = {}
+    for code, name in ecodes.keys.items():
+        # Codes with aliases map to a list of names; use the first, as before
+        if isinstance(name, (list, tuple)):
+            name = name[0]
+        if name.startswith(prefix):
+            names[code] = name
+    return names
+
+
+# Raw BTN_* names by code, resolved once instead of per click
+_BUTTON_NAMES = _key_code_names("BTN_")
+
+# Keyboard key names by code with the KEY_ prefix stripped and lower-cased,
+# the form pressed_keys and _standardize_key_name work with
+_KEY_NAMES = {code: name[4:].lower() for code, name in _key_code_names("KEY_").items()}
+
 class EvdevInputTracker(BaseInputTracker):
     """Tracks keyboard and mouse activity using evdev."""
     
@@ -29,10 +68,25 @@ class EvdevInputTracker(BaseInputTracker):
         self.should_persist = False
         self.devices: List[InputDevice] = []
         self._device_tasks: List[asyncio.Task] = []
+        # One per monitor; stop() sets them all to let the monitors exit
+        self._wakeups: List[asyncio.Event] = []
         self._total_keys = 0
         self._total_clicks = 0
         self._total_scrolls = 0
 
+        # Per key code: (name tracked in pressed_keys, standardized name,
+        # standardized name with shift held)
+        self._key_table: Dict[int, Tuple[str, str, str]] = {
+            code: (key, self._key_variant(key, False), self._key_variant(key, True))
+            for code, key in _KEY_NAMES.items()
+        }
+
+        # Standardized mouse button name for every BTN_* code
+        self._button_names: Dict[int, str] = {
+            code: self._standardize_mouse_button(name)
+            for code, name in _BUTTON_NAMES.items()
+        }
+
     async def enable_persistence(self) -> None:
         """Enable saving sessions to pending_sessions."""
         self.should_persist = True
@@ -48,17 +102,13 @@ class EvdevInputTracker(BaseInputTracker):
             found_devices: List[InputDevice] = []
             
             for device in devices:
-                caps = device.capabilities()
-                
-                if evdev.ecodes.EV_KEY in caps:
-                    # Check for keyboard keys
-                    if any(code in range(evdev.ecodes.KEY_ESC, evdev.ecodes.KEY_MICMUTE + 1)
-                           for code in caps[evdev.ecodes.EV_KEY]):
-                        found_devices.append(device)
-                    # Check for mouse buttons
-                    elif any(code in range(evdev.ecodes.BTN_MOUSE, evdev.ecodes.BTN_TASK + 1)
-                            for code in caps[evdev.ecodes.EV_KEY]):
-                        found_devices.append(device)
+                key_codes = device.capabilities().get(EV_KEY)
+                if not key_codes:
+                    continue
+
+                # Keep devices with keyboard keys or mouse buttons
+                if not _TRACKED_KEY_CODES.isdisjoint(key_codes):
+                    found_devices.append(device)
             
             self.devices = found_devices
             
@@ -67,81 +117,96 @@ class EvdevInputTracker(BaseInputTracker):
 
     async def _monitor_device(self, device: InputDevice) -> None:
         """Monitor a single input device for events."""
+        # Keep the fd registered with the loop's selector for the lifetime of
+        # the monitor; async_read() would add and remove it on every wakeup
+        loop = asyncio.get_running_loop()
+        fd = device.fd
+        readable = asyncio.Event()
+        self._wakeups.append(readable)
+        loop.add_reader(fd, readable.set)
+
+        # Bind everything the per-event loop touches to locals once
+        ev_key, ev_rel, rel_wheel, rel_hwheel = EV_KEY, EV_REL, REL_WHEEL, REL_HWHEEL
+        button_names = self._button_names
+        key_table = self._key_table
+        is_shift_pressed = self._is_shift_pressed
+        iter_unpack = _INPUT_EVENT.iter_unpack
+        event_size = _INPUT_EVENT.size
+        # Bytes of a record split across reads, completed by the next one
+        partial = b""
         try:
-            async for event in device.async_read_loop():
-                if not self.is_running:
-                    break
+            while self.is_running:
+                await readable.wait()
+                readable.clear()
+                # Drain what the kernel has queued, so whole SYN frames (and
+                # bursts of them) are handled per wakeup; anything left over
+                # keeps the fd readable for the next pass
+                try:
+                    buf = partial + os.read(fd, _READ_SIZE)
+                except BlockingIOError:
+                    continue
+                # Decode every complete record and keep any trailing bytes,
+                # so no event (a key release in particular) is dropped
+                complete = len(buf) - len(buf) % event_size
+                partial = buf[complete:]
+                events = iter_unpack(buf[:complete])
 
                 # Skip if no current session or if the current window is private
-                if not self.current_session or self.privacy_config.is_private(self.current_session.window_info):
+                session = self.current_session
+                if not session or session.is_private:
                     continue
 
-                if event.type == evdev.ecodes.EV_KEY:
-                    
-                    key_name = evdev.ecodes.keys.get(event.code)
-                    if isinstance(key_name, list):
-                        key_name = key_name[0]
-                    elif isinstance(key_name, tuple):
-                        key_name = key_name[0]
-                    # logger.debug(f"Key name: {key_name}, event value: {event.value}")
-
-                    # Simplify handling mouse button and keyboard keys
-                    if key_name:
-                        
-                        event_type = "press" if event.value == 1 else "release" if event.value == 0 else "hold"
-                        timestamp = datetime.now().isoformat()
-                        
-                        if key_name.startswith("BTN_"):
+                # Events drained together arrived within the same few
+                # milliseconds, so they share one timestamp (formatted to ISO
+                # only when the session is serialized)
+                timestamp = time.time_ns()
+                for _, _, ev_type, code, value in events:
+                    if ev_type == ev_key:
+                        event_type = "press" if value == 1 else "release" if value == 0 else "hold"
+
+                        button_name = button_names.get(code)
+                        if button_name is not None:
                             # Handle mouse button event
                             if event_type == "press":
-                                button_name = self._standardize_mouse_button(key_name)
                                 self._total_clicks += 1
                                 # logger.debug(f"Mouse button pressed: {button_name}")
-                                await self.current_session.add_event("click", {
-                                    "button": button_name,
-                                    "timestamp": timestamp
-                                })
-                        elif key_name.startswith("KEY_"):
+                                session.add_click(button_name, timestamp)
+                            continue
+
+                        key_entry = key_table.get(code)
+                        # logger.debug(f"Key entry: {key_entry}, event value: {value}")
+
+                        if key_entry is not None:
                             # Handle keyboard key event
-                            key = key_name[4:] # Remove the KEY_ prefix
+                            key, plain_key, shifted_key = key_entry
 
                             # Update pressed_keys for modifier keys
-                            # if key in ["LEFTSHIFT", "RIGHTSHIFT"]:
+                            # if key in ["leftshift", "rightshift"]:
                             if event_type == "press":
-                                self.pressed_keys.add(key.lower())
+                                self.pressed_keys.add(key)
                             elif event_type == "release":
-                                self.pressed_keys.discard(key.lower())
-                            
+                                self.pressed_keys.discard(key)
+
                             # logger.debug(f"Pressed keys: {self.pressed_keys}")
                             if event_type == "press":
                                 self._total_keys += 1
-                                standardized_key = self._standardize_key_name(key)
+                                standardized_key = shifted_key if is_shift_pressed() else plain_key
                                 # logger.debug(f"Key pressed: {standardized_key}")
-                                await self.current_session.add_event("key", {
-                                        "type": event_type,
-                                        "key": standardized_key,
-                                        "timestamp": timestamp
-                                    })
-                                
+                                session.add_key(event_type, standardized_key, timestamp)
+
                                 # Check for hotkeys
                                 # logger.debug(f"Checking hotkeys: {self.pressed_keys}")
                                 await self._check_hotkeys()
 
-                elif event.type == evdev.ecodes.EV_REL:
-                    # Track both vertical and horizontal scroll
-                    if event.code in [evdev.ecodes.REL_WHEEL, evdev.ecodes.REL_HWHEEL]:
-                        self._total_scrolls += abs(event.value)
-                        # Log the scroll event
-                        scroll_direction = "vertical" if event.code == evdev.ecodes.REL_WHEEL else "horizontal"
-                        scroll_amount = event.value
-                        # logger.debug(f"Mouse scrolled: {scroll_direction}, amount: {scroll_amount}")
-                        
-                        if self.current_session:
-                            await self.current_session.add_event("scroll", {
-                                "direction": scroll_direction,
-                                "amount": scroll_amount,
-                                "timestamp": datetime.now().isoformat()
-                            })
+                    elif ev_type == ev_rel:
+                        # Track both vertical and horizontal scroll
+                        if code == rel_wheel or code == rel_hwheel:
+                            self._total_scrolls += abs(value)
+                            # Log the scroll event
+                            scroll_direction = "vertical" if code == rel_wheel else "horizontal"
+                            scroll_amount = value
+                            # logger.debug(f"Mouse scrolled: {scroll_direction}, amount: {scroll_amount}")
+                            session.add_scroll(scroll_direction, scroll_amount, timestamp)
 
         except (OSError, IOError) as e:
             if e.errno == errno.ENODEV:
@@ -157,15 +222,26 @@ class EvdevInputTracker(BaseInputTracker):
         except Exception as e:
             logger.error(f"Error in input monitoring: {e}", exc_info=True)
             await asyncio.sleep(1)
+        finally:
+            loop.remove_reader(fd)
 
     async def _monitor_all_devices(self) -> None:
-        """Monitor all discovered input devices."""
+        """Monitor all discovered input devices until every monitor returns."""
         self._device_tasks = [
             asyncio.create_task(self._monitor_device(device))
             for device in self.devices
         ]
-        if self._device_tasks:
-            await asyncio.wait(self._device_tasks, return_when=asyncio.FIRST_COMPLETED)
+        try:
+            # Cancelling the caller (e.g. on cleanup) cancels every monitor
+            # through gather
+            await asyncio.gather(*self._device_tasks)
+        except Exception:
+            # gather leaves the siblings of a failed monitor running, so
+            # cancel them explicitly and wait for them to finish
+            for task in self._device_tasks:
+                task.cancel()
+            await asyncio.gather(*self._device_tasks, return_exceptions=True)
+            raise
     
     async def start(self) -> None:
         """Start tracking keyboard and mouse events."""
@@ -198,9 +274,11 @@ class EvdevInputTracker(BaseInputTracker):
             await self.current_session.end_session(datetime.now())
             self.current_session = None
 
-        # Cancel all monitoring tasks
-        for task in self._device_tasks:
-            task.cancel()
+        # Wake every monitor so it sees is_running is False and returns on
+        # its own after the batch it is handling
+        for wakeup in self._wakeups:
+            wakeup.set()
+        await asyncio.gather(*self._device_tasks, return_exceptions=True)
         
         # Close all devices
         for device in self.devices:
@@ -211,6 +289,7 @@ class EvdevInputTracker(BaseInputTracker):
 
         self.devices = []
         self._device_tasks = []
+        self._wakeups = []
 
     # async def get_recent_sessions(self, seconds: int = 60) -> List[WindowSession]:
     #     """Get recent sessions from buffer.
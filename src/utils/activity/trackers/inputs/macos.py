@@ -1,5 +1,6 @@
 import asyncio
 import logging
+import time
 from datetime import datetime
 from typing import Dict, List, Optional, Callable, Any
 from collections import deque
@@ -49,12 +50,13 @@ class MacOSInputTracker(BaseInputTracker):
         if not self.is_running:
             return
 
-        timestamp = datetime.now()
-
         # Skip if no current session or if the current window is private
-        if not self.current_session or self.privacy_config.is_private(self.current_session.window_info):
+        if not self.current_session or self.current_session.is_private:
             return
 
+        # Kept as time_ns(); WindowSession.to_dict() formats it to ISO
+        timestamp = time.time_ns()
+
         # logger.debug(f"Processing {event_type} event: {event_data}")
         try:
             if event_type == EventType.CHARACTER:
@@ -70,7 +72,7 @@ class MacOSInputTracker(BaseInputTracker):
         except Exception as e:
             logger.error(f"Error processing input event: {e}", exc_info=True)
 
-    async def _handle_special_key_event(self, event_data: Dict[str, Any], timestamp: datetime):
+    async def _handle_special_key_event(self, event_data: Dict[str, Any], timestamp: int):
         """Handles a special keyboard event."""
         key_name = event_data["key"]
         action = event_data["action"]
@@ -85,7 +87,7 @@ class MacOSInputTracker(BaseInputTracker):
             await self.current_session.add_event("key", {
                 "type": "press",
                 "key": self._standardize_key_name(key_name),  # Use special key name directly
-                "timestamp": timestamp.isoformat()
+                "timestamp": timestamp
             })
             await self._check_hotkeys()
 
@@ -103,10 +105,10 @@ class MacOSInputTracker(BaseInputTracker):
             await self.current_session.add_event("key", {
                 "type": "release",
                 "key": key_name,  # Use special key name directly
-                "timestamp": timestamp.isoformat()
+                "timestamp": timestamp
             })
 
-    async def _handle_key_event(self, event_data: Dict[str, Any], timestamp: datetime):
+    async def _handle_key_event(self, event_data: Dict[str, Any], timestamp: int):
         """Handles a keyboard event."""
         key_name = event_data["key"]
         action = event_data["action"]
@@ -121,7 +123,7 @@ class MacOSInputTracker(BaseInputTracker):
             await self.current_session.add_event("key", {
                 "type": "press",
                 "key": self._standardize_key_name(key_name),
-                "timestamp": timestamp.isoformat()
+                "timestamp": timestamp
             })
             await self._check_hotkeys()
 
@@ -140,10 +142,10 @@ class MacOSInputTracker(BaseInputTracker):
             await self.current_session.add_event("key", {
                 "type": "release",
                 "key": standardized_key,
-                "timestamp": timestamp.isoformat()
+                "timestamp": timestamp
             })
 
-    async def _handle_modifier_event(self, event_data: Dict[str, Any], timestamp: datetime):
+    async def _handle_modifier_event(self, event_data: Dict[str, Any], timestamp: int):
         """Handles modifier key events."""
         modifier_code = event_data.get("modifier")
         state = event_data.get("state")
@@ -160,7 +162,7 @@ class MacOSInputTracker(BaseInputTracker):
             return []
         return [modifier.lower() for modifier in modifiers_string.split("+")]
 
-    async def _handle_mouse_event(self, event_data: Dict[str, Any], timestamp: datetime):
+    async def _handle_mouse_event(self, event_data: Dict[str, Any], timestamp: int):
         """Handles a mouse button event."""
         button = event_data.get("button")
         action = event_data.get("action")
@@ -170,10 +172,10 @@ class MacOSInputTracker(BaseInputTracker):
             self._total_clicks += 1
             await self.current_session.add_event("click", {
                 "button": button_name,
-                "timestamp": timestamp.isoformat()
+                "timestamp": timestamp
             })
 
-    async def _handle_scroll_event(self, event_data: Dict[str, Any], timestamp: datetime):
+    async def _handle_scroll_event(self, event_data: Dict[str, Any], timestamp: int):
         """Handles a mouse scroll event."""
         scroll_delta = event_data.get("delta")
         if scroll_delta is not None:
@@ -182,10 +184,10 @@ class MacOSInputTracker(BaseInputTracker):
             await self.current_session.add_event("scroll", {
                 "direction": scroll_direction,
                 "amount": scroll_delta,
-                "timestamp": timestamp.isoformat()
+                "timestamp": timestamp
             })
 
-    async def _handle_modifier_event(self, event_data: Dict[str, Any], timestamp: datetime):
+    async def _handle_modifier_event(self, event_data: Dict[str, Any], timestamp: int):
         """Handles modifier key events."""
         modifier_code = event_data.get("modifier")
         state = event_data.get("state")
@@ -251,7 +253,7 @@ class MacOSInputTracker(BaseInputTracker):
             self.recent_sessions.append(self.current_session)
 
             # Persist the session if not private
-            if self.should_persist and not self.privacy_config.is_private(self.current_session.window_info):
+            if self.should_persist and not self.current_session.is_private:
                 self.pending_sessions.append(self.current_session)
 
         # Create new session with the new window info
@@ -264,4 +266,6 @@ class MacOSInputTracker(BaseInputTracker):
         else:
             window_info_for_session = {}
 
-        self.current_session = WindowSession(window_info_for_session, now)
\ No newline at end of file
+        self.current_session = WindowSession(
+            window_info_for_session, now, self.privacy_config.is_private(window_info_for_session)
+        )
\ No newline at end of file
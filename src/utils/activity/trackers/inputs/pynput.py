@@ -3,6 +3,7 @@
 
 import asyncio
 import logging
+import time
 from datetime import datetime
 from typing import Dict, List, Any, Optional, Callable
 from collections import deque
@@ -24,6 +25,9 @@ class PynputInputTracker(BaseInputTracker):
         super().__init__(compositor, privacy_config, hotkeys)
         self.listener: Optional[keyboard.Listener] = None
         self.mouse_listener: Optional[mouse.Listener] = None
+        # pynput calls back on its own listener threads; work is handed to
+        # the loop the tracker was started on instead of a throwaway loop
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
         self.current_session: Optional[WindowSession] = None
         self.pending_sessions: List[WindowSession] = []
         self.recent_sessions = deque(maxlen=30)
@@ -44,6 +48,7 @@ class PynputInputTracker(BaseInputTracker):
             if current_window:
                 await self._on_window_focus_change(current_window)
 
+            self._loop = asyncio.get_running_loop()
             self.is_running = True
             self.listener = keyboard.Listener(
                 on_press=self._on_press,
@@ -80,6 +85,30 @@ class PynputInputTracker(BaseInputTracker):
 
         logger.debug("PynputInputTracker stopped")
 
+    def _submit(self, coro) -> None:
+        """Schedule a coroutine from a listener thread on the tracker's loop."""
+        asyncio.run_coroutine_threadsafe(coro, self._loop)
+
+    async def _record_event(self, event_type: str, event_data: Dict[str, Any]) -> None:
+        """Count and store an input event on the loop thread.
+
+        The listener threads only hand the event payload over. The session
+        is resolved here, so the event and its count always land in the same
+        period as get_events sees it.
+        """
+        session = self.current_session
+        # Skip if no active window session or the current window is private
+        if not session or session.is_private:
+            return
+
+        if event_type == "key":
+            self._total_keys += 1
+        elif event_type == "click":
+            self._total_clicks += 1
+        elif event_type == "scroll":
+            self._total_scrolls += abs(event_data["amount"])
+        await session.add_event(event_type, event_data)
+
     def _on_press(self, key):
         """Handle key press events."""
         try:
@@ -90,17 +119,7 @@ class PynputInputTracker(BaseInputTracker):
                 key_name = key.name
             
             self.pressed_keys.add(key_name)
-            asyncio.run(self._check_hotkeys()) # Check hotkeys on press
-
-            # Skip if no active window session
-            if not self.current_session:
-                return
-
-            # Skip if current window is private
-            if self.privacy_config.is_private(self.current_session.window_info):
-                return
-
-            self._total_keys += 1
+            self._submit(self._check_hotkeys()) # Check hotkeys on press
 
             # Convert key names to more readable format
             if hasattr(key, 'char'):
@@ -113,10 +132,10 @@ class PynputInputTracker(BaseInputTracker):
             # Standardize the key name
             standardized_key = self._standardize_key_name(key_name)
 
-            asyncio.run(self.current_session.add_event("key", {
+            self._submit(self._record_event("key", {
                 "type": "press",
                 "key": standardized_key,
-                "timestamp": datetime.now().isoformat()
+                "timestamp": time.time_ns()
             }))
 
         except Exception as e:
@@ -140,19 +159,10 @@ class PynputInputTracker(BaseInputTracker):
     def _on_click(self, x, y, button, pressed):
         """Handle mouse click events."""
         try:
-            # Skip if no active window session
-            if not self.current_session:
-                return
-
-            # Skip if current window is private
-            if self.privacy_config.is_private(self.current_session.window_info):
-                return
-
             if pressed:
-                self._total_clicks += 1
-                asyncio.run(self.current_session.add_event("click", {
+                self._submit(self._record_event("click", {
                     "button": self._standardize_mouse_button(str(button)),
-                    "timestamp": datetime.now().isoformat()
+                    "timestamp": time.time_ns()
                 }))
         except Exception as e:
             logger.error(f"Error in _on_click: {e}")
@@ -160,19 +170,10 @@ class PynputInputTracker(BaseInputTracker):
     def _on_scroll(self, x, y, dx, dy):
         """Handle mouse scroll events."""
         try:
-            # Skip if no active window session
-            if not self.current_session:
-                return
-
-            # Skip if current window is private
-            if self.privacy_config.is_private(self.current_session.window_info):
-                return
-
-            self._total_scrolls += abs(dy)
-            asyncio.run(self.current_session.add_event("scroll", {
+            self._submit(self._record_event("scroll", {
                 "direction": "vertical",
                 "amount": dy,
-                "timestamp": datetime.now().isoformat()
+                "timestamp": time.time_ns()
             }))
         except Exception as e:
             logger.error(f"Error in _on_scroll: {e}")
@@ -4,7 +4,7 @@ import logging
 from io import BytesIO
 from collections import deque
 import asyncio
-from typing import Optional
+from typing import List, Optional, Union
 import cv2
 import numpy as np
 import pyscreenshot
@@ -20,13 +20,18 @@ logger = logging.getLogger(__name__)
 class ScreenCapture:
     """Handles screen capture and privacy filtering with video buffer support, saving frames to disk."""
 
+    # Screenshots are lossy telemetry; JPEG encodes several times faster than
+    # PNG and gives a much smaller base64 payload
+    JPEG_QUALITY = 85
+
     def __init__(self, compositor: BaseCompositor, privacy_config: PrivacyConfig, backend: str = "grim", video_duration: int = 30):
         """Initialize screen capture.
 
         Args:
             compositor: Compositor for getting window information
             privacy_config: Privacy configuration to use
-            backend: Backend for pyscreenshot (e.g., "grim", "mss")
+            backend: Screenshot backend; "grim" runs grim directly, anything
+                else is passed to pyscreenshot (e.g., "mss")
             buffer_duration_seconds: Duration of video buffer in seconds
         """
         self.compositor = compositor
@@ -89,35 +94,17 @@ class ScreenCapture:
             loop = asyncio.get_event_loop()
 
             # Capture screenshot asynchronously
-            screenshot = await loop.run_in_executor(None, lambda: pyscreenshot.grab(backend=self.backend))
-
-            # Convert to PIL Image for drawing
-            img = screenshot if isinstance(screenshot, Image.Image) else Image.fromarray(screenshot)
-            draw = ImageDraw.Draw(img)
-
-            # Apply privacy filtering
-            windows = await self.compositor.get_windows()
-            for window in windows:
-                if self.compositor.is_window_visible(window) and self.privacy_config.is_private(window):
-                    x, y = window['position']
-                    width, height = window['size']
-                    draw.rectangle([(x, y), (x + width, y + height)], fill='black')
-
-                    class_name = window.get('class', 'Unknown Window')
-                    text = f"Window: {class_name}\nFiltered for privacy"
-                    bbox = draw.textbbox((0, 0), text, font=self.font)
-                    text_width = bbox[2] - bbox[0]
-                    text_height = bbox[3] - bbox[1]
-                    text_x = x + (width - text_width) // 2
-                    text_y = y + (height - text_height) // 2
-                    draw.text((text_x, text_y), text, fill='white', font=self.font, align='center')
+            frame = await self._capture()
 
             # Save the frame to disk asynchronously
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = os.path.join(self.temp_dir, f"frame_{timestamp}.png")
+            filename = os.path.join(self.temp_dir, f"frame_{timestamp}.jpg")
 
             # Use run_in_executor to make the blocking save operation asynchronous
-            await loop.run_in_executor(None, img.save, filename, "PNG")
+            if isinstance(frame, bytes):
+                await loop.run_in_executor(None, self._write_frame, frame, filename)
+            else:
+                await loop.run_in_executor(None, self._save_jpeg, frame, filename)
 
             # Manage frame filenames (delete oldest if necessary) - this part can remain synchronous
             if len(self.frame_filenames) == self.video_duration:
@@ -140,9 +127,16 @@ class ScreenCapture:
             logger.info("Video duration is 0, not creating video")
             return None
 
+        # cv2 encoding is blocking CPU work; run it in a thread so callers
+        # gathering this with other shutdown work actually overlap with it.
+        # The record loop may still rotate frames, so hand over a snapshot
+        return await asyncio.to_thread(self._encode_video, list(self.frame_filenames))
+
+    def _encode_video(self, frame_filenames: List[str]) -> Optional[bytes]:
+        """Encode the given frames into an MP4 and return its bytes."""
         try:
             # Get frame dimensions from first frame
-            first_frame = Image.open(self.frame_filenames[0])
+            first_frame = Image.open(frame_filenames[0])
             width, height = first_frame.width, first_frame.height
 
             # Create video writer
@@ -151,7 +145,7 @@ class ScreenCapture:
             out = cv2.VideoWriter(temp_video_file, fourcc, 1, (width, height))
 
             # Write frames to video in order
-            for filename in self.frame_filenames:
+            for filename in frame_filenames:
                 try:
                     img = Image.open(filename)
                     cv_frame = cv2.cvtColor(np.array(img), cv2.COLOR_RGB2BGR)
@@ -175,50 +169,100 @@ class ScreenCapture:
             return None
 
     async def capture_and_encode(self) -> Optional[str]:
-        """Capture single screenshot, apply privacy filtering, save to disk, and encode to base64."""
+        """Capture single screenshot, apply privacy filtering, and encode it to base64 JPEG."""
         try:
+            frame = await self._capture()
+
+            # Encode the image to base64
+            if not isinstance(frame, bytes):
+                buffer = BytesIO()
+                self._save_jpeg(frame, buffer)
+                frame = buffer.getvalue()
+            encoded_image = base64.b64encode(frame).decode('utf-8')
+
+            return encoded_image
+
+        except Exception as e:
+            logger.error(f"Frame capture or saving failed: {e}")
+            return None
+
+    async def _capture(self) -> Union[bytes, Image.Image]:
+        """Capture the screen and black out visible private windows.
+
+        With the grim backend the screenshot arrives already JPEG-encoded and
+        is returned as bytes unless a private window has to be masked, in
+        which case it is decoded for drawing. Otherwise a PIL Image is returned.
+        """
+        if self.backend == "grim":
+            screenshot = await self._grab_grim_jpeg()
+        else:
             # Run screenshot capture in a thread pool since it's CPU-bound
             screenshot = await asyncio.get_event_loop().run_in_executor(
                 None, lambda: pyscreenshot.grab(backend=self.backend)
             )
 
+        # Apply privacy filtering only for visible windows
+        windows = await self.compositor.get_windows()
+        private_windows = [
+            window for window in windows
+            if self.compositor.is_window_visible(window) and self.privacy_config.is_private(window)
+        ]
+
+        if isinstance(screenshot, bytes):
+            if not private_windows:
+                return screenshot
+            img = Image.open(BytesIO(screenshot))
+        else:
             # Convert to PIL Image for drawing
             img = screenshot if isinstance(screenshot, Image.Image) else Image.fromarray(screenshot)
-            draw = ImageDraw.Draw(img)
-
-            # Apply privacy filtering only for visible windows
-            windows = await self.compositor.get_windows()
-            for window in windows:
-                if self.compositor.is_window_visible(window) and self.privacy_config.is_private(window):
-                    # Draw black rectangle over private window
-                    x, y = window['position']
-                    width, height = window['size']
-                    draw.rectangle([(x, y), (x + width, y + height)], fill='black')
-
-                    # Add text
-                    class_name = window.get('class', 'Unknown Window')
-                    text = f"Window: {class_name}\nFiltered for privacy"
-
-                    # Center the text
-                    bbox = draw.textbbox((0, 0), text, font=self.font)
-                    text_width = bbox[2] - bbox[0]
-                    text_height = bbox[3] - bbox[1]
-                    text_x = x + (width - text_width) // 2
-                    text_y = y + (height - text_height) // 2
-
-                    draw.text((text_x, text_y), text, fill='white', font=self.font, align='center')
 
-            # Encode the image to base64
-            buffer = BytesIO()
-            img.save(buffer, format="PNG")
-            encoded_image = base64.b64encode(buffer.getvalue()).decode('utf-8')
+        draw = ImageDraw.Draw(img)
+        for window in private_windows:
+            # Draw black rectangle over private window
+            x, y = window['position']
+            width, height = window['size']
+            draw.rectangle([(x, y), (x + width, y + height)], fill='black')
+
+            # Add text
+            class_name = window.get('class', 'Unknown Window')
+            text = f"Window: {class_name}\nFiltered for privacy"
+
+            # Center the text
+            bbox = draw.textbbox((0, 0), text, font=self.font)
+            text_width = bbox[2] - bbox[0]
+            text_height = bbox[3] - bbox[1]
+            text_x = x + (width - text_width) // 2
+            text_y = y + (height - text_height) // 2
+
+            draw.text((text_x, text_y), text, fill='white', font=self.font, align='center')
+
+        return img
+
+    async def _grab_grim_jpeg(self) -> bytes:
+        """Capture the screen with grim, letting it encode the JPEG itself."""
+        process = await asyncio.create_subprocess_exec(
+            "grim", "-t", "jpeg", "-q", str(self.JPEG_QUALITY), "-",
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+        stdout, stderr = await process.communicate()
+        if process.returncode != 0:
+            raise RuntimeError(f"grim exited with code {process.returncode}: {stderr.decode(errors='replace').strip()}")
+        return stdout
+
+    @staticmethod
+    def _write_frame(data: bytes, filename: str) -> None:
+        """Write an already encoded frame to disk."""
+        with open(filename, "wb") as f:
+            f.write(data)
+
+    def _save_jpeg(self, img: Image.Image, fp) -> None:
+        """Encode img as JPEG to a filename or file object."""
+        # JPEG has no alpha channel
+        if img.mode != "RGB":
+            img = img.convert("RGB")
+        img.save(fp, format="JPEG", quality=self.JPEG_QUALITY)
 
-            return encoded_image
-
-        except Exception as e:
-            logger.error(f"Frame capture or saving failed: {e}")
-            return None
-    
     def _clear_temp_dir(self):
         """Clears all files in the temporary directory."""
         for filename in os.listdir(self.temp_dir):
@@ -7,7 +7,7 @@ keyboard/mouse events and timing for a single window session.
 
 from src.utils.logging import get_logger
 from datetime import datetime
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Union
 
 # Set up logging
 logger = get_logger(__name__)
@@ -15,19 +15,25 @@ logger = get_logger(__name__)
 class WindowSession:
     """Tracks activity data for a single window focus period."""
     
-    def __init__(self, window_info: Dict[str, str], start_time: datetime):
+    def __init__(self, window_info: Dict[str, str], start_time: datetime, is_private: bool = False):
         """Initialize a new window session.
         
         Args:
             window_info: Dict containing window class and title
             start_time: When this window gained focus
+            is_private: Whether the privacy config matched this window,
+                evaluated once when the session starts
         """
         self.window_info = window_info
         self.start_time = start_time
         self.end_time: Optional[datetime] = None
+        self.is_private = is_private
         
-        # Event tracking
-        self.key_events: List[Dict[str, Any]] = []
+        # Key events are kept as parallel columns rather than one dict per
+        # event; to_dict() materializes the dicts once per session
+        self._key_types: List[str] = []
+        self._key_names: List[str] = []
+        self._key_timestamps: List[Union[int, str]] = []
         self.click_count = 0
         self.scroll_count = 0
         self.key_count = 0
@@ -37,18 +43,36 @@ class WindowSession:
         
         Args:
             event_type: Type of event (key, click, scroll)
-            event_data: Event details
+            event_data: Event details; "timestamp" may be an ISO string or
+                an int from time.time_ns()
         """
         if event_type == "key":
-            self.key_events.append(event_data)
-            self.key_count += 1
+            self.add_key(event_data["type"], event_data["key"], event_data["timestamp"])
         elif event_type == "click":
-            self.click_count += 1
+            self.add_click(event_data.get("button"), event_data.get("timestamp"))
         elif event_type == "scroll":
-            self.scroll_count += 1
+            self.add_scroll(event_data.get("direction"), event_data.get("amount"), event_data.get("timestamp"))
         
-        # logger.debug(f"Current session: {self.key_events}")
-    
+        # logger.debug(f"Current session: {self.key_count} key events")
+
+    # Synchronous appends for trackers recording events from a hot loop;
+    # they skip building an event dict and awaiting a coroutine per event
+
+    def add_key(self, event_type: str, key: str, timestamp: Union[int, str]) -> None:
+        """Record a key event."""
+        self._key_types.append(event_type)
+        self._key_names.append(key)
+        self._key_timestamps.append(timestamp)
+        self.key_count += 1
+
+    def add_click(self, button: Optional[str], timestamp: Union[int, str, None]) -> None:
+        """Record a mouse click (only counted)."""
+        self.click_count += 1
+
+    def add_scroll(self, direction: Optional[str], amount: Optional[int], timestamp: Union[int, str, None]) -> None:
+        """Record a scroll event (only counted)."""
+        self.scroll_count += 1
+
     async def end_session(self, end_time: datetime) -> None:
         """End this window session.
         
@@ -74,13 +98,59 @@ class WindowSession:
         Returns:
             Dict containing all session data
         """
+        return self.build_dict()
+
+    def append_to(self, out: List[Dict[str, Any]]) -> None:
+        """Append this session's storage dict to out.
+        
+        Private sessions keep their metadata and counts, but their events
+        are replaced by the privacy filter.
+        
+        Args:
+            out: List of session dicts being built for a flush
+        """
+        if not self.is_private:
+            out.append(self.build_dict())
+            return
+
+        out.append({
+            'window_class': self.window_info['class'],
+            'window_title': self.window_info['title'],
+            'duration': self.duration,
+            'start_time': self.start_time.isoformat(),
+            'end_time': self.end_time.isoformat(),
+            'privacy_filtered': True,
+            'key_count': self.key_count,
+            'click_count': self.click_count,
+            'scroll_count': self.scroll_count,
+            'key_events': [],  # Empty events list
+            'click_events': [],
+            'scroll_events': []
+        })
+
+    def build_dict(self) -> Dict[str, Any]:
+        """Synchronous to_dict(), usable from a worker thread.
+        
+        Key events are formatted straight from the columns.
+        """
+        fromtimestamp = datetime.fromtimestamp
+        key_events = [
+            {
+                "type": event_type,
+                "key": key,
+                # Raw time.time_ns() values are only formatted on the way out
+                "timestamp": fromtimestamp(timestamp / 1e9).isoformat() if isinstance(timestamp, int) else timestamp
+            }
+            for event_type, key, timestamp in zip(self._key_types, self._key_names, self._key_timestamps)
+        ]
+
         return {
             "window_class": self.window_info["class"],
             "window_title": self.window_info["title"],
             "start_time": self.start_time.isoformat(),
             "end_time": self.end_time.isoformat() if self.end_time else None,
             "duration": self.duration,
-            "key_events": self.key_events,
+            "key_events": key_events,
             "click_count": self.click_count,
             "scroll_count": self.scroll_count,
             "key_count": self.key_count
@@ -1,5 +1,6 @@
 """Logging configuration and utilities."""
 
+import functools
 import logging
 from pathlib import Path
 from absl import logging as absl_logging
@@ -101,6 +102,7 @@ def configure_logging(development: bool = True, log_file: Path = Path("memory_sy
     # print(f"1. Open a new terminal in VSCode (Ctrl+Shift+` or cmd+shift+`)")
     # print(f"2. Run: tail -f {log_file.absolute()}\n")
 
+@functools.cache
 def get_logger(name: str) -> logging.Logger:
     """Get a logger instance."""
     # If the name starts with '__main__', replace it with 'src.main'